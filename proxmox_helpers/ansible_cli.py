@@ -10,45 +10,38 @@ import os
 import sys
 import json
 import argparse
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Coroutine, List, NamedTuple, Optional, Tuple
 import logging
 
-from ansible_manager import AnsibleManager
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-def parse_args() -> argparse.Namespace:
-    """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
-        description="Proxmox AI Ansible Integration",
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter
-    )
-    
-    # Create subparsers for different commands
-    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
-    
-    # List playbooks command
-    list_parser = subparsers.add_parser("list", help="List available Ansible playbooks")
-    
-    # Run playbook command
+# Allowed values for choice-restricted options
+GUEST_OPERATIONS = ("create", "start", "stop", "restart", "delete")
+CLUSTER_OPERATIONS = ("status", "create_cluster", "join_cluster", "leave_cluster", "enable_ha")
+BACKUP_OPERATIONS = ("list", "create", "restore", "delete", "schedule")
+BACKUP_MODES = ("snapshot", "suspend", "stop")
+BACKUP_COMPRESSION = ("0", "gzip", "lzo", "zstd")
+
+def _build_list_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the list playbooks command."""
+    subparsers.add_parser("list", help="List available Ansible playbooks")
+
+def _build_run_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the run playbook command."""
     run_parser = subparsers.add_parser("run", help="Run an Ansible playbook")
     run_parser.add_argument("--playbook", required=True, help="Name of the playbook to run")
     run_parser.add_argument("--vars", help="JSON string of variables to pass to the playbook")
     run_parser.add_argument("--limit", help="Limit execution to specific hosts")
     run_parser.add_argument("--tags", help="Comma-separated list of tags to execute")
     run_parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
-    
-    # VM management command
+
+def _build_vm_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the VM management command."""
     vm_parser = subparsers.add_parser("vm", help="Manage VMs using Ansible")
     vm_parser.add_argument("--operation", required=True, 
-                         choices=["create", "start", "stop", "restart", "delete"],
+                         choices=GUEST_OPERATIONS,
                          help="Operation to perform")
-    vm_parser.add_argument("--vm-id", help="ID of the VM to manage")
+    vm_parser.add_argument("--vm-id", help="ID of the VM to manage (comma-separated to manage several)")
     vm_parser.add_argument("--vm-name", help="Name of the VM")
     vm_parser.add_argument("--node", help="Proxmox node where the VM is located")
     vm_parser.add_argument("--memory", type=int, help="Memory in MB (for VM creation)")
@@ -57,13 +50,14 @@ def parse_args() -> argparse.Namespace:
     vm_parser.add_argument("--storage", help="Storage location (for VM creation)")
     vm_parser.add_argument("--template", help="Template to clone (for VM creation)")
     vm_parser.add_argument("--iso", help="ISO image to use (for VM creation)")
-    
-    # Container management command
+
+def _build_ct_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the container management command."""
     ct_parser = subparsers.add_parser("ct", help="Manage containers using Ansible")
     ct_parser.add_argument("--operation", required=True, 
-                         choices=["create", "start", "stop", "restart", "delete"],
+                         choices=GUEST_OPERATIONS,
                          help="Operation to perform")
-    ct_parser.add_argument("--ct-id", help="ID of the container to manage")
+    ct_parser.add_argument("--ct-id", help="ID of the container to manage (comma-separated to manage several)")
     ct_parser.add_argument("--hostname", help="Hostname of the container")
     ct_parser.add_argument("--node", help="Proxmox node where the container is located")
     ct_parser.add_argument("--memory", type=int, help="Memory in MB (for container creation)")
@@ -71,39 +65,191 @@ def parse_args() -> argparse.Namespace:
     ct_parser.add_argument("--disk", help="Disk size (for container creation)")
     ct_parser.add_argument("--storage", help="Storage location (for container creation)")
     ct_parser.add_argument("--ostemplate", help="OS template (for container creation)")
-    
-    # Cluster management command
+
+def _build_cluster_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the cluster management command."""
     cluster_parser = subparsers.add_parser("cluster", help="Manage Proxmox cluster using Ansible")
     cluster_parser.add_argument("--operation", required=True, 
-                              choices=["status", "create_cluster", "join_cluster", "leave_cluster", "enable_ha"],
+                              choices=CLUSTER_OPERATIONS,
                               help="Operation to perform")
     cluster_parser.add_argument("--target-node", help="Target node for operations")
     cluster_parser.add_argument("--source-node", help="Source node for cluster join")
     cluster_parser.add_argument("--cluster-name", help="Name for new cluster")
-    
-    # Backup management command
+
+def _build_backup_parser(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    """Add the backup management command."""
     backup_parser = subparsers.add_parser("backup", help="Manage Proxmox backups using Ansible")
     backup_parser.add_argument("--operation", required=True, 
-                              choices=["list", "create", "restore", "delete", "schedule"],
+                              choices=BACKUP_OPERATIONS,
                               help="Operation to perform")
     backup_parser.add_argument("--vm-id", help="ID of the VM to backup/restore")
     backup_parser.add_argument("--backup-id", help="ID of the backup for restore/delete operations")
     backup_parser.add_argument("--storage", help="Storage location for backups")
     backup_parser.add_argument("--node", help="Proxmox node for backup operations")
-    backup_parser.add_argument("--mode", choices=["snapshot", "suspend", "stop"], 
+    backup_parser.add_argument("--mode", choices=BACKUP_MODES, 
                              help="Backup mode (snapshot, suspend, stop)")
-    backup_parser.add_argument("--compress", choices=["0", "gzip", "lzo", "zstd"], 
+    backup_parser.add_argument("--compress", choices=BACKUP_COMPRESSION, 
                              help="Compression method")
     backup_parser.add_argument("--schedule-hour", help="Hour for scheduled backups (0-23)")
     backup_parser.add_argument("--schedule-minute", help="Minute for scheduled backups (0-59)")
     backup_parser.add_argument("--schedule-day", help="Day of month for scheduled backups (1-31, * for all)")
     backup_parser.add_argument("--schedule-month", help="Month for scheduled backups (1-12, * for all)")
     backup_parser.add_argument("--schedule-weekday", help="Day of week for scheduled backups (0-6, * for all)")
+
+# Subcommand name -> factory adding its subparser, resolved on demand
+_SUBPARSER_BUILDERS = {
+    "list": _build_list_parser,
+    "run": _build_run_parser,
+    "vm": _build_vm_parser,
+    "ct": _build_ct_parser,
+    "cluster": _build_cluster_parser,
+    "backup": _build_backup_parser,
+}
+
+# Flat option schemas for _fast_parse. Values are the type to cast to, a tuple
+# of allowed values, or bool for store_true flags.
+_FAST_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "list": {},
+    "run": {
+        "--playbook": str, "--vars": str, "--limit": str, "--tags": str,
+        "--verbose": bool,
+    },
+    "vm": {
+        "--operation": GUEST_OPERATIONS, "--vm-id": str, "--vm-name": str,
+        "--node": str, "--memory": int, "--cores": int, "--disk-size": str,
+        "--storage": str, "--template": str, "--iso": str,
+    },
+    "ct": {
+        "--operation": GUEST_OPERATIONS, "--ct-id": str, "--hostname": str,
+        "--node": str, "--memory": int, "--cores": int, "--disk": str,
+        "--storage": str, "--ostemplate": str,
+    },
+    "cluster": {
+        "--operation": CLUSTER_OPERATIONS, "--target-node": str,
+        "--source-node": str, "--cluster-name": str,
+    },
+    "backup": {
+        "--operation": BACKUP_OPERATIONS, "--vm-id": str, "--backup-id": str,
+        "--storage": str, "--node": str, "--mode": BACKUP_MODES,
+        "--compress": BACKUP_COMPRESSION, "--schedule-hour": str,
+        "--schedule-minute": str, "--schedule-day": str,
+        "--schedule-month": str, "--schedule-weekday": str,
+    },
+}
+
+# Options each command requires
+_FAST_REQUIRED: Dict[str, Tuple[str, ...]] = {
+    "run": ("--playbook",),
+    "vm": ("--operation",),
+    "ct": ("--operation",),
+    "cluster": ("--operation",),
+    "backup": ("--operation",),
+}
+
+def _fast_parse(argv: List[str],
+                schema: Dict[str, Any],
+                required: Tuple[str, ...] = ()) -> Optional[argparse.Namespace]:
+    """
+    Parse subcommand options against a flat schema in a single pass.
+    
+    Anything the schema does not cover (--help, unknown or abbreviated
+    options, missing values, bad casts or choices) makes this return None so
+    the caller can fall back to argparse for help output and error messages.
+    
+    Args:
+        argv: Subcommand arguments, without the command name
+        schema: Mapping of option to type, tuple of choices or bool
+        required: Options that must be present
+        
+    Returns:
+        Parsed arguments namespace, or None if argparse should handle argv
+    """
+    values: Dict[str, Any] = {opt[2:].replace("-", "_"): (False if kind is bool else None)
+                              for opt, kind in schema.items()}
+    seen = set()
+    i, n = 0, len(argv)
+    while i < n:
+        opt, sep, value = argv[i].partition("=")
+        kind = schema.get(opt)
+        if kind is None:
+            return None
+        i += 1
+        seen.add(opt)
+        dest = opt[2:].replace("-", "_")
+        
+        if kind is bool:
+            if sep:
+                return None
+            values[dest] = True
+            continue
+        
+        if not sep:
+            if i == n or argv[i].startswith("-"):
+                return None
+            value = argv[i]
+            i += 1
+        
+        if isinstance(kind, tuple):
+            if value not in kind:
+                return None
+        else:
+            try:
+                value = kind(value)
+            except ValueError:
+                return None
+        values[dest] = value
+    
+    if not seen.issuperset(required):
+        return None
+    return argparse.Namespace(**values)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    
+    Well-formed subcommand invocations are handled by _fast_parse without
+    constructing any argparse parsers. Otherwise only the subparser for the
+    requested command is built; every subparser is built when no known
+    command is given, so that top-level --help and usage errors still list
+    all commands.
+    
+    Args:
+        argv: Arguments to parse (defaults to sys.argv[1:])
+        
+    Returns:
+        Parsed arguments namespace
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    cmd = argv[0] if argv else ""
+    
+    schema = _FAST_SCHEMAS.get(cmd)
+    if schema is not None:
+        args = _fast_parse(argv[1:], schema, _FAST_REQUIRED.get(cmd, ()))
+        if args is not None:
+            args.command = cmd
+            return args
     
-    return parser.parse_args()
+    parser = argparse.ArgumentParser(
+        description="Proxmox AI Ansible Integration",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    # Create subparsers for different commands
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+    
+    build = _SUBPARSER_BUILDERS.get(cmd)
+    if build is not None:
+        build(subparsers)
+    else:
+        for build in _SUBPARSER_BUILDERS.values():
+            build(subparsers)
+    
+    return parser.parse_args(argv)
 
 def handle_list_command() -> None:
     """Handle the list command to show available playbooks."""
+    from ansible_manager import AnsibleManager
     ansible_mgr = AnsibleManager()
     playbooks = ansible_mgr.list_playbooks()
     
@@ -119,20 +265,19 @@ def handle_list_command() -> None:
 
 def handle_run_command(args: argparse.Namespace) -> None:
     """Handle the run command to execute a specific playbook."""
+    from ansible_manager import AnsibleManager
     ansible_mgr = AnsibleManager()
     
-    # Check if playbook exists
-    playbooks = ansible_mgr.list_playbooks()
-    if args.playbook not in playbooks:
-        print(f"Error: Playbook '{args.playbook}' not found.")
-        print("Available playbooks:", ", ".join(playbooks))
-        sys.exit(1)
-    
-    # Parse extra vars if provided
+    # Parse extra vars if provided, with orjson when available; its decode
+    # errors subclass json.JSONDecodeError
     extra_vars = None
     if args.vars:
         try:
-            extra_vars = json.loads(args.vars)
+            from orjson import loads
+        except ImportError:
+            from json import loads  # type: ignore[assignment]
+        try:
+            extra_vars = loads(args.vars)
         except json.JSONDecodeError:
             print("Error: --vars must be a valid JSON string")
             sys.exit(1)
@@ -144,6 +289,8 @@ def handle_run_command(args: argparse.Namespace) -> None:
     
     # Run the playbook
     print(f"Running playbook: {args.playbook}")
+    print("\nOutput:")
+    print("=======")
     success, output = ansible_mgr.run_playbook(
         playbook_name=args.playbook,
         extra_vars=extra_vars,
@@ -152,150 +299,148 @@ def handle_run_command(args: argparse.Namespace) -> None:
         verbose=args.verbose
     )
     
+    if output:
+        print(output)
+    print()
+    
     if success:
         print("Playbook executed successfully.")
     else:
         print("Playbook execution failed.")
-    
-    print("\nOutput:")
-    print("=======")
-    print(output)
+        sys.exit(1)
 
-def handle_vm_command(args: argparse.Namespace) -> None:
-    """Handle the VM management command."""
-    ansible_mgr = AnsibleManager()
-    
-    # Collect all additional parameters
-    kwargs = {}
-    for arg in ["memory", "cores", "disk_size", "storage", "template", "iso"]:
-        value = getattr(args, arg.replace("-", "_"), None)
-        if value is not None:
-            kwargs[arg] = value
-    
-    print(f"Performing '{args.operation}' operation on VM")
-    success, output = ansible_mgr.run_vm_management(
-        operation=args.operation,
-        vm_id=args.vm_id,
-        vm_name=args.vm_name,
-        node=args.node,
-        **kwargs
-    )
-    
-    if success:
-        print(f"VM {args.operation} operation completed successfully.")
-    else:
-        print(f"VM {args.operation} operation failed.")
-    
-    print("\nOutput:")
-    print("=======")
-    print(output)
+def _split_ids(value: Optional[str]) -> List[Optional[str]]:
+    """
+    Split a comma-separated ID option.
+    
+    A missing option yields [None]; a value without any IDs (such as ",")
+    yields [].
+    """
+    if not value:
+        return [None]
+    return [item.strip() for item in value.split(",") if item.strip()]
 
-def handle_ct_command(args: argparse.Namespace) -> None:
-    """Handle the container management command."""
-    ansible_mgr = AnsibleManager()
-    
-    # Collect all additional parameters
-    kwargs = {}
-    for arg in ["memory", "cores", "disk", "storage", "ostemplate"]:
-        value = getattr(args, arg.replace("-", "_"), None)
-        if value is not None:
-            kwargs[arg] = value
+def _gather(coros: List[Coroutine[Any, Any, Tuple[bool, str]]],
+            limit: int) -> List[Tuple[bool, str]]:
+    """
+    Run playbook coroutines concurrently and return their results in order.
     
-    print(f"Performing '{args.operation}' operation on container")
-    success, output = ansible_mgr.run_container_management(
-        operation=args.operation,
-        ct_id=args.ct_id,
-        ct_hostname=args.hostname,
-        node=args.node,
-        **kwargs
-    )
+    At most limit playbooks run at the same time.
+    """
+    import asyncio
     
-    if success:
-        print(f"Container {args.operation} operation completed successfully.")
-    else:
-        print(f"Container {args.operation} operation failed.")
+    async def gather_all() -> List[Tuple[bool, str]]:
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def bounded(coro: Coroutine[Any, Any, Tuple[bool, str]]) -> Tuple[bool, str]:
+            async with semaphore:
+                return await coro
+        
+        return list(await asyncio.gather(*(bounded(coro) for coro in coros)))
     
-    print("\nOutput:")
-    print("=======")
-    print(output)
+    return asyncio.run(gather_all())
 
-def handle_cluster_command(args: argparse.Namespace) -> None:
-    """Handle the cluster management command."""
-    ansible_mgr = AnsibleManager()
-    
-    print(f"Performing '{args.operation}' operation on Proxmox cluster")
-    success, output = ansible_mgr.run_cluster_management(
-        operation=args.operation,
-        target_node=args.target_node,
-        source_node=args.source_node,
-        cluster_name=args.cluster_name
-    )
-    
-    if success:
-        print(f"Cluster {args.operation} operation completed successfully.")
-    else:
-        print(f"Cluster {args.operation} operation failed.")
-    
-    print("\nOutput:")
-    print("=======")
-    print(output)
+class _Command(NamedTuple):
+    """How a management command maps onto an AnsibleManager method."""
+    method: str                 # AnsibleManager method to call
+    label: str                  # Subject used in status messages
+    target: str                 # Completes "Performing '<operation>' ..."
+    id_field: Optional[str]     # Option that accepts comma-separated IDs
+    plural: str                 # Subject for runs over several IDs
+    fixed: Dict[str, str]       # Method kwarg -> argument, always passed
+    optional: Tuple[str, ...]   # Arguments passed only when set
+
+_DISPATCH: Dict[str, _Command] = {
+    "vm": _Command(
+        "run_vm_management", "VM", "operation on VM", "vm_id", "VMs",
+        {"vm_name": "vm_name", "node": "node"},
+        ("memory", "cores", "disk_size", "storage", "template", "iso")
+    ),
+    "ct": _Command(
+        "run_container_management", "Container", "operation on container", "ct_id", "containers",
+        {"ct_hostname": "hostname", "node": "node"},
+        ("memory", "cores", "disk", "storage", "ostemplate")
+    ),
+    "cluster": _Command(
+        "run_cluster_management", "Cluster", "operation on Proxmox cluster", None, "",
+        {"target_node": "target_node", "source_node": "source_node", "cluster_name": "cluster_name"},
+        ()
+    ),
+    "backup": _Command(
+        "run_backup_management", "Backup", "backup operation", None, "",
+        {"vm_id": "vm_id", "backup_id": "backup_id", "storage": "storage", "node": "node"},
+        ("schedule_hour", "schedule_minute", "schedule_day", "schedule_month",
+         "schedule_weekday", "mode", "compress")
+    ),
+}
 
-def handle_backup_command(args: argparse.Namespace) -> None:
-    """Handle the backup management command."""
+def _run(cmd: str, args: argparse.Namespace) -> None:
+    """Handle a VM, container, cluster or backup management command."""
+    from ansible_manager import AnsibleManager, RUNNER_POOL_WORKERS
     ansible_mgr = AnsibleManager()
+    spec = _DISPATCH[cmd]
     
-    # Collect schedule parameters if provided
-    kwargs = {}
-    schedule_params = ["schedule_hour", "schedule_minute", "schedule_day", 
-                      "schedule_month", "schedule_weekday"]
+    kwargs = {kwarg: getattr(args, attr) for kwarg, attr in spec.fixed.items()}
+    kwargs.update({attr: getattr(args, attr) for attr in spec.optional
+                   if getattr(args, attr, None) is not None})
     
-    for param in schedule_params:
-        value = getattr(args, param, None)
-        if value is not None:
-            kwargs[param] = value
+    id_field = spec.id_field
+    ids = _split_ids(getattr(args, id_field)) if id_field else [None]
+    if id_field and not ids:
+        print(f"Error: --{id_field.replace('_', '-')} must contain at least one ID")
+        sys.exit(1)
+    if id_field and len(ids) > 1:
+        print(f"Performing '{args.operation}' operation on {len(ids)} {spec.plural}")
+        run_async = getattr(ansible_mgr, f"{spec.method}_async")
+        results = _gather([
+            run_async(operation=args.operation, **{id_field: item_id}, **kwargs)
+            for item_id in ids
+        ], RUNNER_POOL_WORKERS)
+        for item_id, (success, output) in zip(ids, results):
+            status = "completed successfully" if success else "failed"
+            print(f"\n{spec.label} {item_id}: {args.operation} operation {status}.")
+            print("Output:")
+            print("=======")
+            print(output)
+        if not all(success for success, _ in results):
+            sys.exit(1)
+        return
     
-    # Add mode and compress if provided
-    if args.mode:
-        kwargs["mode"] = args.mode
+    if id_field:
+        kwargs[id_field] = ids[0]
     
-    if args.compress:
-        kwargs["compress"] = args.compress
+    print(f"Performing '{args.operation}' {spec.target}")
+    print("\nOutput:")
+    print("=======")
+    success, output = getattr(ansible_mgr, spec.method)(operation=args.operation, **kwargs)
     
-    print(f"Performing '{args.operation}' backup operation")
-    success, output = ansible_mgr.run_backup_management(
-        operation=args.operation,
-        vm_id=args.vm_id,
-        backup_id=args.backup_id,
-        storage=args.storage,
-        node=args.node,
-        **kwargs
-    )
+    if output:
+        print(output)
+    print()
     
     if success:
-        print(f"Backup {args.operation} operation completed successfully.")
+        print(f"{spec.label} {args.operation} operation completed successfully.")
     else:
-        print(f"Backup {args.operation} operation failed.")
-    
-    print("\nOutput:")
-    print("=======")
-    print(output)
+        print(f"{spec.label} {args.operation} operation failed.")
+        sys.exit(1)
 
 def main() -> None:
     """Main entry point for the CLI."""
     args = parse_args()
     
+    # Setup logging only where the extra detail is wanted
+    if args.command == "run" or getattr(args, "verbose", False):
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+    
     if args.command == "list":
         handle_list_command()
     elif args.command == "run":
         handle_run_command(args)
-    elif args.command == "vm":
-        handle_vm_command(args)
-    elif args.command == "ct":
-        handle_ct_command(args)
-    elif args.command == "cluster":
-        handle_cluster_command(args)
-    elif args.command == "backup":
-        handle_backup_command(args)
+    elif args.command in _DISPATCH:
+        _run(args.command, args)
     else:
         print("Please specify a command. Use --help for more information.")
         sys.exit(1)
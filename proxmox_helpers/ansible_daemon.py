@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Persistent Ansible Controller for Proxmox AI (proxmox-nlp-ansibled)
+
+This module keeps Ansible imported in a long-running process and serves
+ansible-playbook runs over a UNIX socket, so that each run skips Ansible's
+startup cost. Every run is executed in a forked child of the daemon, which
+starts with Ansible already loaded and cannot leak state into later runs.
+
+AnsibleManager.run_playbook hands runs to the daemon whenever its socket
+exists, and falls back to spawning ansible-playbook otherwise.
+
+Ansible reads its configuration once, when the daemon imports it. Runs are
+therefore declined (and spawned by the client instead) when the client's
+ANSIBLE_* environment differs from the daemon's, or when ansible.cfg has
+changed since the daemon started; restart the daemon to pick up config
+edits. The rest of the client's environment, such as SSH_AUTH_SOCK, is
+applied to each run.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import argparse
+import logging
+import traceback
+from functools import partial
+from typing import Any, Callable, Dict, NoReturn, Optional
+
+from ansible_manager import (
+    AnsibleManager, DAEMON_SOCKET, STREAM_CHUNK_SIZE,
+    FRAME_OUTPUT, FRAME_EXIT, FRAME_ERROR, find_ansible_config, send_frame
+)
+
+logger = logging.getLogger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="proxmox-nlp-ansibled",
+        description="Persistent Ansible controller for Proxmox AI",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--socket", default=DAEMON_SOCKET,
+                        help="UNIX socket to listen on")
+    parser.add_argument("--ansible-path",
+                        help="Base directory for Ansible files (defaults to the project's ansible_integration)")
+    return parser.parse_args()
+
+def _run_playbook_cli(cli_executor: Callable[[Any], Any], args: Any) -> int:
+    """Run ansible-playbook in-process and return its exit status."""
+    try:
+        cli_executor(["ansible-playbook", *args])
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            return e.code
+        return 0 if e.code is None else 1
+    except Exception:
+        traceback.print_exc()
+        return 250
+    return 0
+
+def ansible_settings(env: Dict[str, str]) -> Dict[str, str]:
+    """The ANSIBLE_* variables of an environment, which Ansible reads at import."""
+    return {key: value for key, value in env.items() if key.startswith("ANSIBLE_")}
+
+def config_mtime(config_path: str) -> Optional[int]:
+    """
+    Modification time of the config Ansible reads when ANSIBLE_CONFIG is
+    config_path, or None if there is none.
+    """
+    path = find_ansible_config(config_path)
+    if path is None:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _playbook_child(request: Dict[str, Any],
+                    conn: socket.socket,
+                    read_fd: int,
+                    write_fd: int,
+                    cli_executor: Callable[[Any], Any]) -> NoReturn:
+    """
+    Run the requested playbook in the forked playbook process.
+    
+    Output goes to the pipe and stdin is detached. Never returns; any failure
+    before or during the run exits with status 250.
+    """
+    returncode = 250
+    try:
+        conn.close()
+        os.close(read_fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(write_fd, 1)
+        os.dup2(write_fd, 2)
+        os.close(write_fd)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.chdir(request["cwd"])
+        returncode = _run_playbook_cli(cli_executor, request["args"])
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(returncode)
+
+def handle_connection(conn: socket.socket,
+                      settings: Dict[str, str],
+                      started_config_mtime: Optional[int],
+                      cli_executor: Callable[[Any], Any]) -> None:
+    """
+    Serve one playbook run request.
+    
+    Runs in a forked child of the daemon. The playbook itself runs in a
+    further child whose output is relayed to the client as frames.
+    
+    Failures after the playbook process is forked are reported as a failed
+    run. An exception escaping from here means nothing ran (or the client is
+    gone), so the caller can answer with FRAME_ERROR and let the client run
+    the playbook itself.
+    
+    Args:
+        conn: Connected client socket
+        settings: ANSIBLE_* variables Ansible was imported with
+        started_config_mtime: Modification time of ansible.cfg at import
+        cli_executor: Ansible's ansible-playbook entry point
+    """
+    with conn.makefile("rb") as reader:
+        request: Dict[str, Any] = json.loads(reader.readline())
+    
+    if ansible_settings(request["env"]) != settings:
+        send_frame(conn, FRAME_ERROR, b"ANSIBLE_* environment differs from the daemon's")
+        return
+    
+    if config_mtime(settings["ANSIBLE_CONFIG"]) != started_config_mtime:
+        send_frame(conn, FRAME_ERROR, b"ansible.cfg changed since the daemon started; restart it")
+        return
+    
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        _playbook_child(request, conn, read_fd, write_fd, cli_executor)
+    
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd, "rb", buffering=0) as output:
+            for chunk in iter(partial(output.read, STREAM_CHUNK_SIZE), b""):
+                send_frame(conn, FRAME_OUTPUT, chunk)
+        _, status = os.waitpid(pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+    except Exception as e:
+        # Don't leave the run going unobserved; report it as failed
+        logger.exception("Lost track of playbook run")
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+        returncode = 250
+        send_frame(conn, FRAME_OUTPUT, f"Ansible daemon lost track of the run: {e}\n".encode())
+    
+    send_frame(conn, FRAME_EXIT, str(returncode).encode())
+
+def serve(socket_path: str, ansible_mgr: AnsibleManager) -> None:
+    """
+    Import Ansible and serve playbook runs until interrupted.
+    
+    Args:
+        socket_path: UNIX socket to listen on
+        ansible_mgr: Manager whose environment and config runs use
+    """
+    # Ansible reads its configuration at import time, so the manager's
+    # environment has to be in place before the import. Runs whose settings
+    # differ from these are declined.
+    os.environ.update(ansible_mgr.ansible_env)
+    settings = ansible_settings(ansible_mgr.ansible_env)
+    started_config_mtime = config_mtime(settings["ANSIBLE_CONFIG"])
+    from ansible.cli.playbook import PlaybookCLI
+    cli_executor = PlaybookCLI.cli_executor
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    logger.info(f"Ansible daemon listening on {socket_path}")
+    
+    # Let the kernel reap finished connection handlers
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    try:
+        while True:
+            conn, _ = server.accept()
+            pid = os.fork()
+            if pid == 0:
+                # Connection handler: must never unwind back into this loop
+                try:
+                    server.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    handle_connection(conn, settings, started_config_mtime, cli_executor)
+                except BaseException as e:
+                    logger.exception("Failed to handle Ansible daemon request")
+                    try:
+                        send_frame(conn, FRAME_ERROR, f"daemon failed: {e}".encode())
+                    except BaseException:
+                        pass
+                finally:
+                    os._exit(0)
+            conn.close()
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        logger.info("Ansible daemon stopped")
+
+def main() -> None:
+    """Main entry point for the daemon."""
+    args = parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    try:
+        serve(args.socket, AnsibleManager(ansible_path=args.ansible_path))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,184 @@ for Proxmox configuration management directly from the Proxmox AI system.
 """
 
 import os
+import sys
 import json
+import hashlib
+import pickle
+import shlex
 import subprocess
+import tempfile
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import IO, TYPE_CHECKING, Callable, Dict, KeysView, List, Literal, Any, Optional, Union, Tuple, overload
 from pathlib import Path
+from types import MappingProxyType
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+if TYPE_CHECKING:
+    import socket
+
+def _dumps(obj: Any) -> str:
+    """Encode --extra-vars payloads, with orjson when available."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(obj)
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Logging is configured by the application; stay silent otherwise
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Per-user cache directory for data reused across CLI invocations
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "proxmox-nlp"
+)
+PLAYBOOK_CACHE_FILE = os.path.join(CACHE_DIR, "playbooks.pkl")
+
+# Default number of parallel Ansible processes, used when neither
+# ANSIBLE_FORKS nor ansible.cfg sets forks
+DEFAULT_FORKS = 20
+
+# Map VM operations to playbook states
+_VM_OP_MAP = MappingProxyType({
+    'create': 'present',
+    'start': 'started',
+    'stop': 'stopped',
+    'restart': 'restarted',
+    'delete': 'absent'
+})
+_VM_OP_KEYS_JOINED = ', '.join(_VM_OP_MAP)
+
+# Map container operations to playbook states
+_CT_OP_MAP = MappingProxyType({
+    'create': 'present',
+    'start': 'started',
+    'stop': 'stopped',
+    'restart': 'restarted',
+    'delete': 'absent'
+})
+_CT_OP_KEYS_JOINED = ', '.join(_CT_OP_MAP)
+
+# Operations supported by the backup playbook
+_BACKUP_OPERATIONS = ('list', 'create', 'restore', 'delete', 'schedule')
+_BACKUP_OPERATIONS_JOINED = ', '.join(_BACKUP_OPERATIONS)
+
+# Worker threads for playbooks submitted with async_=True
+RUNNER_POOL_WORKERS = 4
+
+# Shared pool for asynchronous playbook runs, created on first use
+_RUNNER_POOL: Optional[ThreadPoolExecutor] = None
+_RUNNER_POOL_LOCK = threading.Lock()
+
+def _get_runner_pool() -> ThreadPoolExecutor:
+    """Return the shared playbook worker pool, creating it if needed."""
+    global _RUNNER_POOL
+    with _RUNNER_POOL_LOCK:
+        if _RUNNER_POOL is None:
+            _RUNNER_POOL = ThreadPoolExecutor(
+                max_workers=RUNNER_POOL_WORKERS,
+                thread_name_prefix="ansible-playbook"
+            )
+        return _RUNNER_POOL
+
+# Extra vars larger than this (in bytes of JSON) are passed as an @file
+EXTRA_VARS_INLINE_LIMIT = 4096
+
+# Preferred directory for extra vars files (tmpfs on Linux)
+EXTRA_VARS_DIR = "/dev/shm"
+
+# Chunk size for streaming playbook output
+STREAM_CHUNK_SIZE = 65536
+
+# UNIX socket of the persistent Ansible controller (ansible_daemon.py)
+DAEMON_SOCKET = os.environ.get("PROXMOX_NLP_ANSIBLED_SOCKET", "/run/proxmox-nlp.sock")
+
+# Daemon reply frames: one type byte, a 4-byte big-endian length, the payload
+FRAME_OUTPUT = b"O"   # Chunk of playbook output
+FRAME_EXIT = b"X"     # Exit status of the run, as ASCII digits
+FRAME_ERROR = b"E"    # Request declined or failed before anything ran
+
+def send_frame(conn: "socket.socket", kind: bytes, payload: bytes) -> None:
+    """Send one daemon reply frame."""
+    conn.sendall(kind + len(payload).to_bytes(4, "big") + payload)
+
+def read_frame(reader: IO[bytes]) -> Tuple[bytes, bytes]:
+    """Read one daemon reply frame as (kind, payload)."""
+    header = reader.read(5)
+    if len(header) < 5:
+        raise ConnectionError("Ansible daemon closed the connection")
+    length = int.from_bytes(header[1:], "big")
+    payload = reader.read(length)
+    if len(payload) < length:
+        raise ConnectionError("Ansible daemon closed the connection")
+    return header[:1], payload
+
+def _completed_future(result: Tuple[bool, str]) -> "Future[Tuple[bool, str]]":
+    """Wrap a result that is already known in a finished Future."""
+    future: "Future[Tuple[bool, str]]" = Future()
+    future.set_result(result)
+    return future
+
+def _write_stdout(chunk: bytes) -> None:
+    """Default output sink: write raw playbook output to stdout as it arrives."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+
+def _remove_quietly(path: str) -> None:
+    """Delete a temporary file, ignoring errors."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _read_spool(f: IO[bytes]) -> str:
+    """Read back everything a child process wrote to a spool file."""
+    f.seek(0)
+    return f.read().decode(errors="replace")
+
+# Seconds a dynamic inventory (such as the Proxmox plugin) stays cached.
+# Kept short so newly created guests show up quickly; ANSIBLE_INVENTORY_CACHE=False
+# bypasses the cache for a run.
+INVENTORY_CACHE_TIMEOUT = 60
+
+# Configs Ansible falls back to when <ansible_path>/ansible.cfg does not exist
+GLOBAL_ANSIBLE_CONFIGS = (os.path.expanduser("~/.ansible.cfg"), "/etc/ansible/ansible.cfg")
+
+# Written to <ansible_path>/ansible.cfg when Ansible would find no config at
+# all; it would shadow the global configs otherwise. Formatted with
+# inventory_path.
+DEFAULT_ANSIBLE_CFG = """[defaults]
+inventory={inventory_path}
+fact_caching=jsonfile
+fact_caching_connection={facts_dir}
+fact_caching_timeout=7200
+gathering=smart
+pipelining=True
+forks={forks}
+
+[inventory]
+cache=True
+cache_plugin=jsonfile
+cache_connection={inventory_cache_dir}
+cache_timeout={inventory_cache_timeout}
+"""
+
+def find_ansible_config(config_path: str) -> Optional[str]:
+    """
+    Find the config file Ansible reads when ANSIBLE_CONFIG is config_path.
+    
+    Returns:
+        config_path if it exists, else the first existing global config, or
+        None if Ansible runs without a config file
+    """
+    for path in (config_path, *GLOBAL_ANSIBLE_CONFIGS):
+        if os.path.isfile(path):
+            return path
+    return None
 
 class AnsibleManager:
     """
@@ -22,9 +191,9 @@ class AnsibleManager:
     """
     
     def __init__(self, 
-                 ansible_path: str = None, 
-                 inventory_path: str = None,
-                 playbooks_path: str = None):
+                 ansible_path: Optional[str] = None, 
+                 inventory_path: Optional[str] = None,
+                 playbooks_path: Optional[str] = None) -> None:
         """
         Initialize the AnsibleManager with paths to ansible resources.
         
@@ -39,76 +208,455 @@ class AnsibleManager:
         self.inventory_path = inventory_path or os.path.join(self.ansible_path, "inventory")
         self.playbooks_path = playbooks_path or os.path.join(self.ansible_path, "playbooks")
         
+        # Playbook index, built on first access to available_playbooks
+        self._available_playbooks: Optional[Dict[str, str]] = None
+        
         # Verify paths exist
         self._verify_paths()
         
-        # Available playbooks map (name -> file path)
-        self.available_playbooks = self._scan_playbooks()
+        # Environment for ansible-playbook processes, built once per manager.
+        # Strategy and pipelining defaults yield to values already set. The
+        # inventory cache prefix keeps each Ansible tree's cached inventory
+        # apart in the shared cache directory, while all playbooks of a tree
+        # share one cache.
+        tree_key = hashlib.sha1(os.fsencode(self.ansible_path)).hexdigest()[:12]
+        self._base_env = {
+            "ANSIBLE_STRATEGY": "free",
+            "ANSIBLE_PIPELINING": "True",
+            "ANSIBLE_INVENTORY_CACHE_PLUGIN_PREFIX": f"proxmox_nlp_{tree_key}_",
+            **os.environ,
+            "ANSIBLE_CONFIG": os.path.join(self.ansible_path, "ansible.cfg"),
+        }
         
+        # Only override forks on the command line if nothing else sets them
+        self._forks_args = [] if self._forks_configured() else ["-f", str(DEFAULT_FORKS)]
+        
+    @property
+    def ansible_env(self) -> Dict[str, str]:
+        """Environment ansible-playbook runs with for this manager."""
+        return self._base_env
+    
+    def _forks_configured(self) -> bool:
+        """Whether ANSIBLE_FORKS or the Ansible config already sets forks."""
+        if self._base_env.get("ANSIBLE_FORKS"):
+            return True
+        
+        config_path = find_ansible_config(self._base_env["ANSIBLE_CONFIG"])
+        if config_path is None:
+            return False
+        
+        import configparser
+        
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read(config_path)
+        except (configparser.Error, UnicodeDecodeError) as e:
+            logger.debug(f"Could not read Ansible config: {e}")
+            return False
+        return parser.has_option("defaults", "forks")
+    
+    @property
+    def available_playbooks(self) -> Dict[str, str]:
+        """Available playbooks map (name -> file path), scanned on first use."""
+        if self._available_playbooks is None:
+            self._available_playbooks = self._scan_playbooks()
+        return self._available_playbooks
+    
     def _verify_paths(self) -> None:
-        """Verify that required directories exist."""
+        """Verify that required directories and the Ansible config exist."""
         for path in [self.ansible_path, self.inventory_path, self.playbooks_path]:
             if not os.path.exists(path):
                 logger.warning(f"Path does not exist: {path}")
                 os.makedirs(path, exist_ok=True)
                 logger.info(f"Created directory: {path}")
+        
+        config_path = os.path.join(self.ansible_path, "ansible.cfg")
+        existing = find_ansible_config(config_path)
+        if existing is not None:
+            if existing != config_path:
+                logger.debug(f"Using Ansible config {existing}")
+        else:
+            try:
+                with open(config_path, "x") as f:
+                    f.write(DEFAULT_ANSIBLE_CFG.format(
+                        inventory_path=self.inventory_path,
+                        facts_dir=os.path.join(CACHE_DIR, "facts"),
+                        forks=DEFAULT_FORKS,
+                        inventory_cache_dir=os.path.join(CACHE_DIR, "inv"),
+                        inventory_cache_timeout=INVENTORY_CACHE_TIMEOUT
+                    ))
+                logger.info(f"Created Ansible config with fact caching: {config_path}")
+            except FileExistsError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not write Ansible config {config_path}: {e}")
     
     def _scan_playbooks(self) -> Dict[str, str]:
         """
         Scan and index available playbooks.
         
+        The index is cached on disk and reused while the modification time of
+        the playbooks directory is unchanged.
+        
         Returns:
             Dict mapping playbook name to file path
         """
-        playbooks = {}
+        try:
+            mtime_ns = os.stat(self.playbooks_path).st_mtime_ns
+        except OSError:
+            logger.info("Found 0 Ansible playbooks")
+            return {}
+        
+        cached = self._load_playbook_cache()
+        if (cached and cached.get("path") == self.playbooks_path
+                and cached.get("mtime_ns") == mtime_ns):
+            playbooks: Dict[str, str] = cached["playbooks"]
+            logger.info(f"Found {len(playbooks)} Ansible playbooks (cached)")
+            return playbooks
         
-        if os.path.exists(self.playbooks_path):
-            for file in os.listdir(self.playbooks_path):
-                if file.endswith(('.yml', '.yaml')):
-                    name = file.replace('.yml', '').replace('.yaml', '')
-                    path = os.path.join(self.playbooks_path, file)
-                    playbooks[name] = path
+        playbooks = {}
+        with os.scandir(self.playbooks_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(('.yml', '.yaml')) and entry.is_file():
+                    playbooks[name.rsplit('.', 1)[0]] = entry.path
         
+        self._save_playbook_cache(mtime_ns, playbooks)
         logger.info(f"Found {len(playbooks)} Ansible playbooks")
         return playbooks
     
-    def list_playbooks(self) -> List[str]:
+    def _load_playbook_cache(self) -> Optional[Dict[str, Any]]:
+        """Load the on-disk playbook index, or None if missing or unreadable."""
+        try:
+            with open(PLAYBOOK_CACHE_FILE, "rb") as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable playbook cache: {e}")
+            return None
+        return cached if isinstance(cached, dict) else None
+    
+    def _save_playbook_cache(self, mtime_ns: int, playbooks: Dict[str, str]) -> None:
+        """Write the playbook index to disk for later invocations."""
+        data = {"path": self.playbooks_path, "mtime_ns": mtime_ns, "playbooks": playbooks}
+        tmp_path = f"{PLAYBOOK_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, PLAYBOOK_CACHE_FILE)
+        except OSError as e:
+            logger.debug(f"Could not write playbook cache: {e}")
+    
+    def list_playbooks(self) -> KeysView[str]:
         """
         List all available playbooks.
         
         Returns:
-            List of playbook names
+            Live view of playbook names (supports O(1) membership tests)
+        """
+        return self.available_playbooks.keys()
+    
+    def _resolve_playbook(self, playbook_name: str) -> Optional[str]:
         """
-        return list(self.available_playbooks.keys())
+        Find the file for a playbook without scanning the playbooks directory.
+        
+        Uses the playbook index if it has already been built, otherwise checks
+        for the playbook file directly.
+        
+        Args:
+            playbook_name: Name of the playbook
+            
+        Returns:
+            Path to the playbook file, or None if it does not exist
+        """
+        if self._available_playbooks is not None:
+            return self._available_playbooks.get(playbook_name)
+        
+        if not playbook_name or os.path.basename(playbook_name) != playbook_name:
+            return None
+        
+        for ext in ('.yml', '.yaml'):
+            path = os.path.join(self.playbooks_path, playbook_name + ext)
+            if os.path.isfile(path):
+                return path
+        return None
+    
+    @overload
+    def run_playbook(self,
+                    playbook_name: str,
+                    extra_vars: Optional[Dict[str, Any]] = ...,
+                    limit_hosts: Optional[str] = ...,
+                    tags: Optional[List[str]] = ...,
+                    verbose: bool = ...,
+                    serial: Optional[int] = ...,
+                    async_: Literal[False] = ...,
+                    stdout_sink: Optional[Callable[[bytes], None]] = ...
+                    ) -> Tuple[bool, str]: ...
+    
+    @overload
+    def run_playbook(self,
+                    playbook_name: str,
+                    extra_vars: Optional[Dict[str, Any]] = ...,
+                    limit_hosts: Optional[str] = ...,
+                    tags: Optional[List[str]] = ...,
+                    verbose: bool = ...,
+                    serial: Optional[int] = ...,
+                    *,
+                    async_: Literal[True],
+                    stdout_sink: Optional[Callable[[bytes], None]] = ...
+                    ) -> "Future[Tuple[bool, str]]": ...
+    
+    @overload
+    def run_playbook(self,
+                    playbook_name: str,
+                    extra_vars: Optional[Dict[str, Any]] = ...,
+                    limit_hosts: Optional[str] = ...,
+                    tags: Optional[List[str]] = ...,
+                    verbose: bool = ...,
+                    serial: Optional[int] = ...,
+                    async_: bool = ...,
+                    stdout_sink: Optional[Callable[[bytes], None]] = ...
+                    ) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]: ...
     
     def run_playbook(self, 
                     playbook_name: str, 
-                    extra_vars: Dict[str, Any] = None,
-                    limit_hosts: str = None,
-                    tags: List[str] = None,
-                    verbose: bool = False) -> Tuple[bool, str]:
+                    extra_vars: Optional[Dict[str, Any]] = None,
+                    limit_hosts: Optional[str] = None,
+                    tags: Optional[List[str]] = None,
+                    verbose: bool = False,
+                    serial: Optional[int] = None,
+                    async_: bool = False,
+                    stdout_sink: Optional[Callable[[bytes], None]] = None
+                    ) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]:
         """
         Run an Ansible playbook with specified parameters.
         
+        Playbooks run with the free strategy and SSH pipelining unless the
+        environment says otherwise, and with DEFAULT_FORKS forks unless
+        ANSIBLE_FORKS or ansible.cfg sets forks.
+        
+        Output (stdout and stderr combined) is streamed to stdout_sink while
+        the playbook runs rather than collected, so the returned output is
+        empty on success and only describes the failure otherwise. Blocking
+        calls stream to stdout by default. With async_ and no stdout_sink,
+        the output is collected instead and returned like
+        run_playbook_async does, so parallel runs do not interleave on stdout.
+        
+        If the Ansible daemon is listening on DAEMON_SOCKET the run is handed
+        to it, which skips Ansible's startup cost. The daemon declines runs
+        whose ANSIBLE_* environment or ansible.cfg differ from what it was
+        started with; those are run directly instead.
+        
         Args:
             playbook_name: Name of the playbook to run
             extra_vars: Dictionary of variables to pass to the playbook
             limit_hosts: Limit execution to specific hosts
             tags: List of tags to execute
             verbose: Enable verbose output
+            serial: Passed to the playbook as the 'serial' variable to cap
+                    how many hosts are handled at once
+            async_: Run on the shared worker pool and return a Future
+            stdout_sink: Called with each chunk of raw output (defaults to
+                         writing to stdout, or to collecting the output
+                         when async_ is set)
             
         Returns:
-            Tuple containing (success: bool, output: str)
+            Tuple containing (success: bool, output: str), or a Future
+            resolving to it when async_ is set
+        """
+        if async_:
+            if stdout_sink is None:
+                return _get_runner_pool().submit(
+                    self._run_playbook_collected, playbook_name, extra_vars,
+                    limit_hosts, tags, verbose, serial
+                )
+            return _get_runner_pool().submit(
+                self.run_playbook, playbook_name, extra_vars,
+                limit_hosts, tags, verbose, serial,
+                stdout_sink=stdout_sink
+            )
+        
+        # Validate playbook exists
+        playbook_path = self._resolve_playbook(playbook_name)
+        if playbook_path is None:
+            playbooks_list = ", ".join(sorted(self.available_playbooks))
+            return False, f"Playbook '{playbook_name}' not found. Available playbooks: {playbooks_list}"
+        
+        cmd, vars_file = self._build_command(playbook_path, extra_vars, limit_hosts, tags, verbose, serial)
+        
+        sink = stdout_sink or _write_stdout
+        
+        try:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Running Ansible playbook: %s", shlex.join(cmd))
+            returncode = self._run_via_daemon(cmd, sink)
+            if returncode is None:
+                with subprocess.Popen(
+                    cmd,
+                    env=self._base_env,
+                    cwd=self.ansible_path,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=0
+                ) as proc:
+                    assert proc.stdout is not None
+                    for chunk in iter(partial(proc.stdout.read, STREAM_CHUNK_SIZE), b""):
+                        sink(chunk)
+                    returncode = proc.wait()
+            
+            if returncode == 0:
+                logger.info(f"Playbook '{playbook_name}' executed successfully")
+                return True, ""
+            else:
+                logger.error(f"Playbook '{playbook_name}' failed with exit status {returncode}")
+                return False, f"Error: ansible-playbook exited with status {returncode}"
+                
+        except Exception as e:
+            logger.exception(f"Failed to execute playbook '{playbook_name}'")
+            return False, f"Exception: {str(e)}"
+        finally:
+            if vars_file:
+                _remove_quietly(vars_file)
+    
+    def _run_playbook_collected(self,
+                                playbook_name: str,
+                                extra_vars: Optional[Dict[str, Any]],
+                                limit_hosts: Optional[str],
+                                tags: Optional[List[str]],
+                                verbose: bool,
+                                serial: Optional[int]) -> Tuple[bool, str]:
+        """
+        Run a playbook and return its output instead of streaming it.
+        
+        Returns:
+            Tuple containing (success: bool, output: str); on failure the
+            output follows the error message
+        """
+        chunks: List[bytes] = []
+        success, error = self.run_playbook(playbook_name, extra_vars, limit_hosts,
+                                           tags, verbose, serial,
+                                           stdout_sink=chunks.append)
+        output = b"".join(chunks).decode(errors="replace")
+        if success:
+            return True, output
+        return False, f"{error}\n{output}" if output else error
+    
+    def _run_via_daemon(self, cmd: List[str], sink: Callable[[bytes], None]) -> Optional[int]:
+        """
+        Run an ansible-playbook command through the persistent Ansible daemon.
+        
+        Args:
+            cmd: ansible-playbook command line
+            sink: Called with each chunk of output
+            
+        Returns:
+            Exit status of the run, or None if no daemon is listening or it
+            declined the request (the caller should run the command itself)
         """
+        if not os.path.exists(DAEMON_SOCKET):
+            return None
+        
+        # Encoded with json rather than orjson: environment values that are not
+        # valid UTF-8 arrive as surrogate escapes, which only json accepts
+        # (and the daemon's json.loads round-trips)
+        try:
+            payload = json.dumps({
+                "args": cmd[1:],
+                "cwd": self.ansible_path,
+                "env": self._base_env,
+            }).encode() + b"\n"
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Cannot hand run to the Ansible daemon: {e}")
+            return None
+        
+        import socket
+        
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(DAEMON_SOCKET)
+        except OSError as e:
+            logger.debug(f"Ansible daemon unavailable at {DAEMON_SOCKET}: {e}")
+            sock.close()
+            return None
+        
+        with sock, sock.makefile("rb") as reader:
+            sock.sendall(payload)
+            
+            while True:
+                kind, payload = read_frame(reader)
+                if kind == FRAME_OUTPUT:
+                    sink(payload)
+                elif kind == FRAME_EXIT:
+                    return int(payload)
+                else:
+                    logger.info(f"Ansible daemon declined the run: {payload.decode(errors='replace')}")
+                    return None
+    
+    async def run_playbook_async(self,
+                                 playbook_name: str,
+                                 extra_vars: Optional[Dict[str, Any]] = None,
+                                 limit_hosts: Optional[str] = None,
+                                 tags: Optional[List[str]] = None,
+                                 verbose: bool = False,
+                                 serial: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Run an Ansible playbook without blocking the event loop.
+        
+        Takes the same arguments as run_playbook. Gather several of these to
+        let playbooks make progress while others wait on their hosts.
+        
+        Returns:
+            Tuple containing (success: bool, output: str); output is stdout
+            and stderr combined, preceded by the error message on failure
+        """
+        import asyncio
+        
         # Validate playbook exists
-        if playbook_name not in self.available_playbooks:
-            playbooks_list = ", ".join(self.list_playbooks())
+        playbook_path = self._resolve_playbook(playbook_name)
+        if playbook_path is None:
+            playbooks_list = ", ".join(sorted(self.available_playbooks))
             return False, f"Playbook '{playbook_name}' not found. Available playbooks: {playbooks_list}"
         
-        playbook_path = self.available_playbooks[playbook_name]
+        cmd, vars_file = self._build_command(playbook_path, extra_vars, limit_hosts, tags, verbose, serial)
         
-        # Build command
-        cmd = ["ansible-playbook", playbook_path]
+        try:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Running Ansible playbook: %s", shlex.join(cmd))
+            with tempfile.TemporaryFile() as out:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=out,
+                    stderr=subprocess.STDOUT,
+                    env=self._base_env,
+                    cwd=self.ansible_path
+                )
+                returncode = await proc.wait()
+                return self._playbook_result(playbook_name, returncode, _read_spool(out))
+                
+        except Exception as e:
+            logger.exception(f"Failed to execute playbook '{playbook_name}'")
+            return False, f"Exception: {str(e)}"
+        finally:
+            if vars_file:
+                _remove_quietly(vars_file)
+    
+    def _build_command(self,
+                       playbook_path: str,
+                       extra_vars: Optional[Dict[str, Any]],
+                       limit_hosts: Optional[str],
+                       tags: Optional[List[str]],
+                       verbose: bool,
+                       serial: Optional[int]) -> Tuple[List[str], Optional[str]]:
+        """
+        Build the ansible-playbook command line for a run.
+        
+        Returns:
+            Tuple containing (command, extra vars file to delete after the
+            run or None)
+        """
+        cmd = ["ansible-playbook", playbook_path, *self._forks_args]
         
         # Add verbose flag if requested
         if verbose:
@@ -122,43 +670,66 @@ class AnsibleManager:
         if tags:
             cmd.extend(["-t", ",".join(tags)])
             
+        # Let callers cap concurrency per play
+        if serial is not None:
+            extra_vars = {**(extra_vars or {}), 'serial': serial}
+            
         # Add extra vars if specified
+        vars_file = None
         if extra_vars:
-            extra_vars_json = json.dumps(extra_vars)
-            cmd.extend(["--extra-vars", extra_vars_json])
-            
-        # Set environment variables for ansible execution
-        env = os.environ.copy()
-        env["ANSIBLE_CONFIG"] = os.path.join(self.ansible_path, "ansible.cfg")
+            extra_vars_json = _dumps(extra_vars)
+            if len(extra_vars_json) > EXTRA_VARS_INLINE_LIMIT:
+                vars_file = self._write_extra_vars_file(extra_vars_json)
+            if vars_file:
+                cmd.extend(["--extra-vars", f"@{vars_file}"])
+            else:
+                cmd.extend(["--extra-vars", extra_vars_json])
         
+        return cmd, vars_file
+    
+    def _write_extra_vars_file(self, extra_vars_json: str) -> Optional[str]:
+        """
+        Write large extra vars to a temporary file for the @file syntax.
+        
+        Returns:
+            Path to the file, or None to pass the vars inline instead
+        """
+        tmp_dir = EXTRA_VARS_DIR if os.path.isdir(EXTRA_VARS_DIR) else None
         try:
-            logger.info(f"Running Ansible playbook: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                env=env,
-                cwd=self.ansible_path,
-                check=False,
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                logger.info(f"Playbook '{playbook_name}' executed successfully")
-                return True, result.stdout
-            else:
-                logger.error(f"Playbook '{playbook_name}' failed: {result.stderr}")
-                return False, f"Error: {result.stderr}"
-                
-        except Exception as e:
-            logger.exception(f"Failed to execute playbook '{playbook_name}'")
-            return False, f"Exception: {str(e)}"
+            with tempfile.NamedTemporaryFile("w", suffix=".json", dir=tmp_dir,
+                                             prefix="proxmox-nlp-vars-",
+                                             delete=False) as f:
+                f.write(extra_vars_json)
+                return f.name
+        except OSError as e:
+            logger.warning(f"Could not write extra vars file, passing them inline: {e}")
+            return None
+    
+    def _playbook_result(self,
+                         playbook_name: str,
+                         returncode: int,
+                         output: str) -> Tuple[bool, str]:
+        """
+        Turn a finished, captured ansible-playbook process into (success, output).
+        
+        Failed runs return the error message followed by the output, like
+        _run_playbook_collected.
+        """
+        if returncode == 0:
+            logger.info(f"Playbook '{playbook_name}' executed successfully")
+            return True, output
+        else:
+            logger.error(f"Playbook '{playbook_name}' failed with exit status {returncode}")
+            error = f"Error: ansible-playbook exited with status {returncode}"
+            return False, f"{error}\n{output}" if output else error
     
     def run_vm_management(self, 
                           operation: str, 
-                          vm_id: Union[int, str] = None,
-                          vm_name: str = None,
-                          node: str = None,
-                          **kwargs) -> Tuple[bool, str]:
+                          vm_id: Optional[Union[int, str]] = None,
+                          vm_name: Optional[str] = None,
+                          node: Optional[str] = None,
+                          async_: bool = False,
+                          **kwargs: Any) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]:
         """
         Run VM management operations using the Ansible playbook.
         
@@ -167,25 +738,58 @@ class AnsibleManager:
             vm_id: ID of the VM to manage
             vm_name: Name of the VM 
             node: Proxmox node where the VM is located
+            async_: Return a Future instead of waiting for the playbook
             **kwargs: Additional parameters for VM creation
             
+        Returns:
+            Tuple containing (success: bool, output: str), or a Future
+            resolving to it when async_ is set
+        """
+        extra_vars, error = self._vm_extra_vars(operation, vm_id, vm_name, node, kwargs)
+        if extra_vars is None:
+            return _completed_future((False, error)) if async_ else (False, error)
+        
+        return self.run_playbook('proxmox_vm_manager', extra_vars=extra_vars, async_=async_)
+    
+    async def run_vm_management_async(self,
+                                      operation: str,
+                                      vm_id: Optional[Union[int, str]] = None,
+                                      vm_name: Optional[str] = None,
+                                      node: Optional[str] = None,
+                                      **kwargs: Any) -> Tuple[bool, str]:
+        """
+        Run VM management operations without blocking the event loop.
+        
+        Takes the same arguments as run_vm_management.
+        
         Returns:
             Tuple containing (success: bool, output: str)
         """
-        # Map operations to playbook states
-        op_map = {
-            'create': 'present',
-            'start': 'started',
-            'stop': 'stopped',
-            'restart': 'restarted',
-            'delete': 'absent'
-        }
+        extra_vars, error = self._vm_extra_vars(operation, vm_id, vm_name, node, kwargs)
+        if extra_vars is None:
+            return False, error
+        
+        return await self.run_playbook_async('proxmox_vm_manager', extra_vars=extra_vars)
+    
+    def _vm_extra_vars(self,
+                       operation: str,
+                       vm_id: Union[int, str, None],
+                       vm_name: Optional[str],
+                       node: Optional[str],
+                       kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Build VM playbook variables.
         
-        if operation not in op_map:
-            return False, f"Invalid operation '{operation}'. Must be one of: {', '.join(op_map.keys())}"
+        Returns:
+            Tuple containing (extra_vars, error); extra_vars is None and error
+            is set if the operation is invalid
+        """
+        state = _VM_OP_MAP.get(operation)
+        if state is None:
+            return None, f"Invalid operation '{operation}'. Must be one of: {_VM_OP_KEYS_JOINED}"
         
         extra_vars = {
-            'vm_state': op_map[operation],
+            'vm_state': state,
             'vm_id': vm_id,
             'vm_name': vm_name,
         }
@@ -195,15 +799,15 @@ class AnsibleManager:
             
         # Add any additional kwargs as variables
         extra_vars.update(kwargs)
-        
-        return self.run_playbook('proxmox_vm_manager', extra_vars=extra_vars)
+        return extra_vars, ""
     
     def run_container_management(self, 
                                 operation: str, 
-                                ct_id: Union[int, str] = None,
-                                ct_hostname: str = None,
-                                node: str = None,
-                                **kwargs) -> Tuple[bool, str]:
+                                ct_id: Optional[Union[int, str]] = None,
+                                ct_hostname: Optional[str] = None,
+                                node: Optional[str] = None,
+                                async_: bool = False,
+                                **kwargs: Any) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]:
         """
         Run container management operations using the Ansible playbook.
         
@@ -212,25 +816,58 @@ class AnsibleManager:
             ct_id: ID of the container to manage
             ct_hostname: Hostname of the container
             node: Proxmox node where the container is located
+            async_: Return a Future instead of waiting for the playbook
             **kwargs: Additional parameters for container creation
             
+        Returns:
+            Tuple containing (success: bool, output: str), or a Future
+            resolving to it when async_ is set
+        """
+        extra_vars, error = self._ct_extra_vars(operation, ct_id, ct_hostname, node, kwargs)
+        if extra_vars is None:
+            return _completed_future((False, error)) if async_ else (False, error)
+        
+        return self.run_playbook('proxmox_container_manager', extra_vars=extra_vars, async_=async_)
+    
+    async def run_container_management_async(self,
+                                             operation: str,
+                                             ct_id: Optional[Union[int, str]] = None,
+                                             ct_hostname: Optional[str] = None,
+                                             node: Optional[str] = None,
+                                             **kwargs: Any) -> Tuple[bool, str]:
+        """
+        Run container management operations without blocking the event loop.
+        
+        Takes the same arguments as run_container_management.
+        
         Returns:
             Tuple containing (success: bool, output: str)
         """
-        # Map operations to playbook states
-        op_map = {
-            'create': 'present',
-            'start': 'started',
-            'stop': 'stopped',
-            'restart': 'restarted',
-            'delete': 'absent'
-        }
+        extra_vars, error = self._ct_extra_vars(operation, ct_id, ct_hostname, node, kwargs)
+        if extra_vars is None:
+            return False, error
+        
+        return await self.run_playbook_async('proxmox_container_manager', extra_vars=extra_vars)
+    
+    def _ct_extra_vars(self,
+                       operation: str,
+                       ct_id: Union[int, str, None],
+                       ct_hostname: Optional[str],
+                       node: Optional[str],
+                       kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Build container playbook variables.
         
-        if operation not in op_map:
-            return False, f"Invalid operation '{operation}'. Must be one of: {', '.join(op_map.keys())}"
+        Returns:
+            Tuple containing (extra_vars, error); extra_vars is None and error
+            is set if the operation is invalid
+        """
+        state = _CT_OP_MAP.get(operation)
+        if state is None:
+            return None, f"Invalid operation '{operation}'. Must be one of: {_CT_OP_KEYS_JOINED}"
         
         extra_vars = {
-            'ct_state': op_map[operation],
+            'ct_state': state,
             'ct_id': ct_id,
             'ct_hostname': ct_hostname,
         }
@@ -240,15 +877,15 @@ class AnsibleManager:
             
         # Add any additional kwargs as variables
         extra_vars.update(kwargs)
-        
-        return self.run_playbook('proxmox_container_manager', extra_vars=extra_vars)
+        return extra_vars, ""
     
     def run_cluster_management(self, 
                               operation: str,
-                              target_node: str = None,
-                              source_node: str = None,
-                              cluster_name: str = None,
-                              **kwargs) -> Tuple[bool, str]:
+                              target_node: Optional[str] = None,
+                              source_node: Optional[str] = None,
+                              cluster_name: Optional[str] = None,
+                              async_: bool = False,
+                              **kwargs: Any) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]:
         """
         Run Proxmox cluster management operations.
         
@@ -257,12 +894,14 @@ class AnsibleManager:
             target_node: Target node for operations
             source_node: Source node for cluster join
             cluster_name: Name for new cluster
+            async_: Return a Future instead of waiting for the playbook
             **kwargs: Additional parameters
             
         Returns:
-            Tuple containing (success: bool, output: str)
+            Tuple containing (success: bool, output: str), or a Future
+            resolving to it when async_ is set
         """
-        extra_vars = {'operation': operation}
+        extra_vars: Dict[str, Any] = {'operation': operation}
         
         if target_node:
             extra_vars['target_node'] = target_node
@@ -276,15 +915,16 @@ class AnsibleManager:
         # Add any additional kwargs as variables
         extra_vars.update(kwargs)
         
-        return self.run_playbook('proxmox_cluster_manager', extra_vars=extra_vars)
+        return self.run_playbook('proxmox_cluster_manager', extra_vars=extra_vars, async_=async_)
     
     def run_backup_management(self,
                              operation: str,
-                             vm_id: Union[int, str] = None,
-                             backup_id: str = None,
-                             storage: str = None,
-                             node: str = None,
-                             **kwargs) -> Tuple[bool, str]:
+                             vm_id: Optional[Union[int, str]] = None,
+                             backup_id: Optional[str] = None,
+                             storage: Optional[str] = None,
+                             node: Optional[str] = None,
+                             async_: bool = False,
+                             **kwargs: Any) -> Union[Tuple[bool, str], "Future[Tuple[bool, str]]"]:
         """
         Run Proxmox backup management operations.
         
@@ -294,19 +934,21 @@ class AnsibleManager:
             backup_id: ID of the backup for restore/delete operations
             storage: Storage location for backups
             node: Proxmox node for backup operations
+            async_: Return a Future instead of waiting for the playbook
             **kwargs: Additional parameters including:
                       - mode: Backup mode (snapshot, suspend, etc)
                       - compress: Compression method
                       - schedule_hour, schedule_minute, etc: For scheduling
             
         Returns:
-            Tuple containing (success: bool, output: str)
+            Tuple containing (success: bool, output: str), or a Future
+            resolving to it when async_ is set
         """
-        valid_operations = ['list', 'create', 'restore', 'delete', 'schedule']
-        if operation not in valid_operations:
-            return False, f"Invalid operation '{operation}'. Must be one of: {', '.join(valid_operations)}"
+        if operation not in _BACKUP_OPERATIONS:
+            error = f"Invalid operation '{operation}'. Must be one of: {_BACKUP_OPERATIONS_JOINED}"
+            return _completed_future((False, error)) if async_ else (False, error)
         
-        extra_vars = {'operation': operation}
+        extra_vars: Dict[str, Any] = {'operation': operation}
         
         if vm_id:
             extra_vars['vm_id'] = vm_id
@@ -323,4 +965,4 @@ class AnsibleManager:
         # Add any additional kwargs as variables
         extra_vars.update(kwargs)
         
-        return self.run_playbook('proxmox_backup_manager', extra_vars=extra_vars)
\ No newline at end of file
+        return self.run_playbook('proxmox_backup_manager', extra_vars=extra_vars, async_=async_)
\ No newline at end of file
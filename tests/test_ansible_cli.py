@@ -0,0 +1,113 @@
+"""
+Tests that the CLI's fast argument parser agrees with argparse.
+
+Run with: python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import argparse
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "proxmox_helpers"))
+
+import ansible_cli
+from ansible_cli import _FAST_REQUIRED, _FAST_SCHEMAS, _SUBPARSER_BUILDERS, _fast_parse
+
+# Invocations _fast_parse must either parse exactly like argparse or hand back
+PARITY_CASES: List[List[str]] = [
+    ["list"],
+    ["run", "--playbook", "site"],
+    ["run", "--playbook=site", "--verbose"],
+    ["run", "--playbook", "site", "--vars", '{"a": 1}', "--tags", "a,b", "--limit", "pve1"],
+    ["run", "--playbook", "site", "--limit=-pve1"],
+    ["run", "--playbook", "site", "--limit", "-pve1"],
+    ["run", "--playbook", "site", "--verbose", "--verbose"],
+    ["run", "--playbook", "a", "--playbook", "b"],
+    ["run", "--playbook", ""],
+    ["run", "--playbook="],
+    ["run"],
+    ["run", "--playbook"],
+    ["vm", "--operation", "start", "--vm-id", "100,101"],
+    ["vm", "--operation=create", "--memory=2048", "--cores", "2", "--vm-name", "test"],
+    ["vm", "--operation", "create", "--memory=-512"],
+    ["vm", "--operation", "create", "--memory", "-512"],
+    ["vm", "--operation", "create", "--memory", "1", "--memory", "2"],
+    ["vm", "--operation", "create", "--disk-size", "32G", "--storage", "local-lvm"],
+    ["vm", "--operation", "create", "--vm-name", ""],
+    ["vm", "--operation", "bogus"],
+    ["vm", "--vm-id", "100"],
+    ["ct", "--operation", "stop", "--ct-id", "200", "--hostname", "web"],
+    ["ct", "--operation", "create", "--cores", "two"],
+    ["cluster", "--operation", "status", "--target-node", "pve2"],
+    ["cluster", "--operation", "join_cluster", "--source-node=pve1", "--cluster-name=lab"],
+    ["backup", "--operation", "create", "--vm-id", "100", "--mode", "snapshot", "--compress", "zstd"],
+    ["backup", "--operation", "schedule", "--schedule-hour", "2", "--schedule-weekday", "*"],
+    ["backup", "--operation", "create", "--compress", "bzip2"],
+    ["backup", "--operation", "create", "extra"],
+]
+
+# Invocations argparse accepts (or answers itself) that _fast_parse must decline
+FALLBACK_CASES: List[List[str]] = [
+    ["list", "--help"],
+    ["run", "-h"],
+    ["run", "--play", "site"],
+    ["run", "--playbook", "site", "--verbose=1"],
+    ["vm", "--op", "start"],
+    ["vm", "--operation", "create", "--memory", "lots"],
+    ["vm", "--operation", "create", "--memory", "-512"],
+    ["ct", "--operation", "reboot"],
+    ["backup", "--operation", "create", "--mode", "hibernate"],
+    ["cluster", "--operation", "status", "--unknown", "x"],
+]
+
+def argparse_parse(argv: List[str]) -> Optional[Dict[str, object]]:
+    """Parse argv with the full argparse parser; None if argparse exits."""
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command")
+    for build in _SUBPARSER_BUILDERS.values():
+        build(subparsers)
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            return vars(parser.parse_args(argv))
+    except SystemExit:
+        return None
+
+def fast_parse(argv: List[str]) -> Optional[Dict[str, object]]:
+    """Parse argv with _fast_parse the way parse_args does."""
+    cmd = argv[0]
+    args = _fast_parse(argv[1:], _FAST_SCHEMAS[cmd], _FAST_REQUIRED.get(cmd, ()))
+    if args is None:
+        return None
+    args.command = cmd
+    return vars(args)
+
+class FastParseParityTest(unittest.TestCase):
+    """_fast_parse against the argparse subparsers."""
+
+    def test_parity(self) -> None:
+        for argv in PARITY_CASES:
+            with self.subTest(argv=argv):
+                fast = fast_parse(argv)
+                expected = argparse_parse(argv)
+                if fast is not None:
+                    self.assertEqual(fast, expected)
+                elif expected is not None:
+                    # Only known fallbacks may decline what argparse accepts
+                    self.assertIn(argv, FALLBACK_CASES)
+
+    def test_fallback(self) -> None:
+        for argv in FALLBACK_CASES:
+            with self.subTest(argv=argv):
+                self.assertIsNone(fast_parse(argv))
+
+    def test_parse_args_uses_argparse_on_fallback(self) -> None:
+        args = ansible_cli.parse_args(["run", "--play", "site"])
+        self.assertEqual(args.playbook, "site")
+        self.assertEqual(args.command, "run")
+
+if __name__ == "__main__":
+    unittest.main()
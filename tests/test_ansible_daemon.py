@@ -0,0 +1,176 @@
+"""
+Tests for the Ansible daemon's frame protocol and forked playbook runs.
+
+Run with: python -m unittest discover tests
+"""
+
+import io
+import os
+import json
+import sys
+import socket
+import tempfile
+import threading
+import unittest
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "proxmox_helpers"))
+
+import ansible_daemon
+import ansible_manager
+from ansible_manager import (
+    AnsibleManager, FRAME_OUTPUT, FRAME_EXIT, FRAME_ERROR, read_frame, send_frame
+)
+
+def fake_cli_executor(argv: List[str]) -> None:
+    """Stand-in for PlaybookCLI.cli_executor that echoes its inputs."""
+    os.write(1, f"args={' '.join(argv[1:])}\n".encode())
+    os.write(1, f"cwd={os.getcwd()}\n".encode())
+    os.write(1, f"ssh={os.environ.get('SSH_AUTH_SOCK')}\n".encode())
+    os.write(1, b"weird=" + os.environb.get(b"WEIRD", b"") + b"\n")
+    raise SystemExit(int(os.environ.get("FAKE_EXIT", "0")))
+
+class FrameTest(unittest.TestCase):
+    """send_frame / read_frame round trips."""
+
+    def test_round_trip(self) -> None:
+        a, b = socket.socketpair()
+        with a, b, b.makefile("rb") as reader:
+            send_frame(a, FRAME_OUTPUT, b"hello")
+            send_frame(a, FRAME_EXIT, b"0")
+            self.assertEqual(read_frame(reader), (FRAME_OUTPUT, b"hello"))
+            self.assertEqual(read_frame(reader), (FRAME_EXIT, b"0"))
+
+    def test_truncated_frame(self) -> None:
+        with self.assertRaises(ConnectionError):
+            read_frame(io.BytesIO(FRAME_OUTPUT + (10).to_bytes(4, "big") + b"short"))
+        with self.assertRaises(ConnectionError):
+            read_frame(io.BytesIO(b""))
+
+class HandleConnectionTest(unittest.TestCase):
+    """handle_connection, which forks the playbook process."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.config = os.path.join(self.tmp, "ansible.cfg")
+        with open(self.config, "w") as f:
+            f.write("[defaults]\n")
+        self.env = {"ANSIBLE_CONFIG": self.config, "SSH_AUTH_SOCK": "/agent.sock"}
+
+    def serve(self, request: Dict[str, Any]) -> List[Tuple[bytes, bytes]]:
+        """Send one request through handle_connection and collect the frames."""
+        client, server = socket.socketpair()
+        with client, client.makefile("rb") as reader:
+            with server:
+                client.sendall(json.dumps(request).encode() + b"\n")
+                ansible_daemon.handle_connection(
+                    server,
+                    ansible_daemon.ansible_settings(self.env),
+                    ansible_daemon.config_mtime(self.config),
+                    fake_cli_executor
+                )
+            frames = []
+            while True:
+                kind, payload = read_frame(reader)
+                frames.append((kind, payload))
+                if kind != FRAME_OUTPUT:
+                    return frames
+
+    def request(self, **overrides: Any) -> Dict[str, Any]:
+        return {"args": ["site.yml"], "cwd": self.tmp, "env": self.env, **overrides}
+
+    def test_successful_run(self) -> None:
+        frames = self.serve(self.request())
+        output = b"".join(payload for kind, payload in frames if kind == FRAME_OUTPUT)
+        self.assertEqual(frames[-1], (FRAME_EXIT, b"0"))
+        self.assertIn(b"args=site.yml\n", output)
+        self.assertIn(f"cwd={os.path.realpath(self.tmp)}\n".encode(), output)
+        self.assertIn(b"ssh=/agent.sock\n", output)
+
+    def test_exit_status_is_relayed(self) -> None:
+        frames = self.serve(self.request(env={**self.env, "FAKE_EXIT": "2"}))
+        self.assertEqual(frames[-1], (FRAME_EXIT, b"2"))
+
+    def test_child_setup_failure_is_not_success(self) -> None:
+        frames = self.serve(self.request(cwd=os.path.join(self.tmp, "missing")))
+        self.assertEqual(frames[-1], (FRAME_EXIT, b"250"))
+
+    def test_declines_different_ansible_settings(self) -> None:
+        frames = self.serve(self.request(env={**self.env, "ANSIBLE_STRATEGY": "linear"}))
+        self.assertEqual([kind for kind, _ in frames], [FRAME_ERROR])
+
+    def test_declines_after_config_change(self) -> None:
+        client, server = socket.socketpair()
+        with client, server, client.makefile("rb") as reader:
+            client.sendall(json.dumps(self.request()).encode() + b"\n")
+            ansible_daemon.handle_connection(
+                server,
+                ansible_daemon.ansible_settings(self.env),
+                os.stat(self.config).st_mtime_ns - 1,
+                fake_cli_executor
+            )
+            self.assertEqual(read_frame(reader)[0], FRAME_ERROR)
+
+class RunViaDaemonTest(unittest.TestCase):
+    """AnsibleManager._run_via_daemon against a daemon connection handler."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.socket_path = os.path.join(tmp.name, "ansibled.sock")
+        patcher = mock.patch.object(ansible_manager, "DAEMON_SOCKET", self.socket_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with mock.patch.dict(os.environ, {"SSH_AUTH_SOCK": "/agent.sock"}):
+            self.mgr = AnsibleManager(ansible_path=os.path.join(tmp.name, "ansible"))
+
+    def run_once(self, settings: Dict[str, str]) -> Tuple[Optional[int], bytes]:
+        """Serve one connection in a thread and run a command through it."""
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        config = settings.get("ANSIBLE_CONFIG", "")
+
+        def accept() -> None:
+            conn, _ = server.accept()
+            with conn:
+                ansible_daemon.handle_connection(
+                    conn, settings, ansible_daemon.config_mtime(config), fake_cli_executor
+                )
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+        chunks: List[bytes] = []
+        try:
+            returncode = self.mgr._run_via_daemon(["ansible-playbook", "site.yml"], chunks.append)
+        finally:
+            thread.join()
+            server.close()
+        return returncode, b"".join(chunks)
+
+    def test_run_uses_manager_environment(self) -> None:
+        returncode, output = self.run_once(ansible_daemon.ansible_settings(self.mgr.ansible_env))
+        self.assertEqual(returncode, 0)
+        self.assertIn(b"ssh=/agent.sock\n", output)
+
+    def test_environment_that_is_not_utf8(self) -> None:
+        weird = os.fsdecode(b"\xff\xfe")
+        with mock.patch.dict(os.environ, {"WEIRD": weird}):
+            self.mgr = AnsibleManager(ansible_path=self.mgr.ansible_path)
+        returncode, output = self.run_once(ansible_daemon.ansible_settings(self.mgr.ansible_env))
+        self.assertEqual(returncode, 0)
+        self.assertIn(b"weird=\xff\xfe\n", output)
+
+    def test_declined_run_falls_back(self) -> None:
+        returncode, output = self.run_once({"ANSIBLE_CONFIG": "/elsewhere/ansible.cfg"})
+        self.assertIsNone(returncode)
+        self.assertEqual(output, b"")
+
+    def test_no_daemon(self) -> None:
+        self.assertIsNone(self.mgr._run_via_daemon(["ansible-playbook", "site.yml"], print))
+
+if __name__ == "__main__":
+    unittest.main()